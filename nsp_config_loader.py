@@ -4,11 +4,15 @@ import logging
 from typing import Dict, Set
 from nsp_exceptions import ConfigError
 
+# Parsed loaders memoized by (absolute path, mtime); see ConfigLoader.get()
+_CONFIG_CACHE: Dict[tuple, 'ConfigLoader'] = {}
+
+
 class ConfigLoader:
     """Handles loading and validating configuration from INI files."""
 
     # Define known keys for each section
-    KNOWN_KAFKA_KEYS = {
+    KNOWN_KAFKA_KEYS = frozenset({
         'bootstrap_servers',
         'security_protocol',
         'ssl_cafile',
@@ -20,13 +24,19 @@ class ConfigLoader:
         'default_topics',
         'consumer_timeout_ms',
         'enable_auto_commit',
+        'auto_commit_interval_ms',
         'auto_offset_reset',
         'max_poll_records',
+        'fetch_min_bytes',
+        'fetch_max_bytes',
+        'fetch_max_wait_ms',
+        'max_partition_fetch_bytes',
+        'receive_buffer_bytes',
         'value_deserializer',
         'key_deserializer'
-    }
+    })
     
-    KNOWN_NSP_KEYS = {
+    KNOWN_NSP_KEYS = frozenset({
         'server',  # Also known as nsp_server
         'nsp_server',  # Alternative name
         'user',  # Also known as username
@@ -40,7 +50,14 @@ class ConfigLoader:
         'access_token',  # Current access token
         'refresh_token',
         'token_expiry'
-    }
+    })
+
+    KNOWN_SECTIONS = frozenset({'KAFKA', 'NSP'})
+
+    # Precomputed once so the warning loops never re-sort and re-join
+    _KAFKA_KEYS_SORTED_STR = ', '.join(sorted(KNOWN_KAFKA_KEYS))
+    _NSP_KEYS_SORTED_STR = ', '.join(sorted(KNOWN_NSP_KEYS))
+    _SECTIONS_SORTED_STR = ', '.join(sorted(KNOWN_SECTIONS))
 
     def __init__(self, config_file: str = 'nsp_config.ini'):
         self.config_file = os.environ.get('NSP_CONFIG', config_file)
@@ -48,11 +65,44 @@ class ConfigLoader:
         self.config = self._load_config()
         self._validate_all_sections()
 
+        # Parse each section once; configparser re-interpolates values on every
+        # items() call, so the per-call cost is paid here instead.
+        self._kafka_cache = dict(self.config.items('KAFKA')) if self.config.has_section('KAFKA') else None
+        self._nsp_cache = dict(self.config.items('NSP')) if self.config.has_section('NSP') else None
+
+        # Per-section option index for constant-time required-field checks
+        self._options_index = {s: frozenset(self.config.options(s)) for s in self.config.sections()}
+
+    @classmethod
+    def get(cls, config_file: str = 'nsp_config.ini') -> 'ConfigLoader':
+        """Return a cached loader for the given file, re-parsing only when it changed.
+
+        Applications that build several clients against the same config file
+        would otherwise re-read, re-parse and re-validate the INI per
+        instantiation. The cache key includes the file mtime, so an edited
+        file is picked up on the next call.
+        """
+        path = os.path.abspath(os.environ.get('NSP_CONFIG', config_file))
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            # Let __init__ raise the usual helpful ConfigError
+            return cls(config_file)
+
+        loader = _CONFIG_CACHE.get(key)
+        if loader is None:
+            loader = cls(config_file)
+            _CONFIG_CACHE[key] = loader
+        return loader
+
     def _load_config(self) -> configparser.ConfigParser:
         config = configparser.ConfigParser()
-        if not os.path.exists(self.config_file):
+        try:
+            fp = open(self.config_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
             self._raise_config_not_found_error()
-        config.read(self.config_file)
+        with fp:
+            config.read_file(fp)
         return config
     
     def _raise_config_not_found_error(self):
@@ -91,58 +141,60 @@ class ConfigLoader:
         raise ConfigError(error_msg)
 
     def get_kafka_config(self) -> Dict[str, str]:
-        if not self.config.has_section('KAFKA'):
+        if self._kafka_cache is None:
             raise ConfigError(f"No [KAFKA] section in {self.config_file}")
-
-        kafka_config = {}
-        for key, value in self.config.items('KAFKA'):
-            kafka_config[key] = value
-
-        return kafka_config
+        return dict(self._kafka_cache)
 
     def get_nsp_config(self) -> Dict[str, str]:
-        if not self.config.has_section('NSP'):
+        if self._nsp_cache is None:
             raise ConfigError(f"No [NSP] section in {self.config_file}")
-
-        nsp_config = {}
-        for key, value in self.config.items('NSP'):
-            nsp_config[key] = value
-
-        return nsp_config
+        return dict(self._nsp_cache)
 
     def validate_required_fields(self, section: str, fields: list):
-        for field in fields:
-            if not self.config.has_option(section, field):
-                raise ConfigError(f"Required field '{field}' missing in section '{section}' of {self.config_file}")
+        present = self._options_index.get(section, ())
+        missing = [field for field in fields if field not in present]
+        if missing:
+            raise ConfigError(
+                f"Required field(s) {', '.join(repr(f) for f in missing)} missing "
+                f"in section '{section}' of {self.config_file}"
+            )
     
-    def _validate_section_keys(self, section: str, known_keys: Set[str]):
+    def _validate_section_keys(self, section: str, known_keys: frozenset, known_keys_str: str):
         """Validate keys in a section and warn about unknown ones."""
+        # Validation only produces warnings, so skip the set work entirely
+        # when warnings are filtered out anyway.
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         if not self.config.has_section(section):
             return
-        
+
         actual_keys = set(self.config.options(section))
-        unknown_keys = actual_keys - known_keys
-        
-        if unknown_keys:
-            for key in unknown_keys:
-                self.logger.warning(
-                    f"Unknown configuration key '{key}' in section [{section}] of {self.config_file}. "
-                    f"This key will be ignored. Known keys are: {', '.join(sorted(known_keys))}"
-                )
-    
+        # Clean configs are the common case; the subset check avoids
+        # allocating a difference set for them
+        if actual_keys <= known_keys:
+            return
+
+        for key in actual_keys - known_keys:
+            self.logger.warning(
+                f"Unknown configuration key '{key}' in section [{section}] of {self.config_file}. "
+                f"This key will be ignored. Known keys are: {known_keys_str}"
+            )
+
     def _validate_all_sections(self):
         """Validate all sections for unknown keys."""
-        self._validate_section_keys('KAFKA', self.KNOWN_KAFKA_KEYS)
-        self._validate_section_keys('NSP', self.KNOWN_NSP_KEYS)
-        
+        self._validate_section_keys('KAFKA', self.KNOWN_KAFKA_KEYS, self._KAFKA_KEYS_SORTED_STR)
+        self._validate_section_keys('NSP', self.KNOWN_NSP_KEYS, self._NSP_KEYS_SORTED_STR)
+
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
+
         # Warn about unknown sections
-        known_sections = {'KAFKA', 'NSP'}
         actual_sections = set(self.config.sections())
-        unknown_sections = actual_sections - known_sections
-        
-        if unknown_sections:
-            for section in unknown_sections:
-                self.logger.warning(
-                    f"Unknown configuration section [{section}] in {self.config_file}. "
-                    f"This section will be ignored. Known sections are: {', '.join(sorted(known_sections))}"
-                )
+        if actual_sections <= self.KNOWN_SECTIONS:
+            return
+
+        for section in actual_sections - self.KNOWN_SECTIONS:
+            self.logger.warning(
+                f"Unknown configuration section [{section}] in {self.config_file}. "
+                f"This section will be ignored. Known sections are: {self._SECTIONS_SORTED_STR}"
+            )
@@ -22,17 +22,39 @@ Date: 2025-01-28
 """
 
 import json
+import os
+import sys
 import requests
 import configparser
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
 # Import custom exceptions
 from nsp_exceptions import NSPError, ConfigError, TokenError
 
+# orjson parses large response bodies several times faster than stdlib
+# json; fall back transparently when it isn't installed
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps_bytes(value) -> bytes:
+        return orjson.dumps(value)
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps_bytes(value) -> bytes:
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
 # Import our token manager
 try:
     import nsp_token_manager
@@ -62,6 +84,26 @@ if not logger.handlers:
     # Prevent propagation to root logger
     logger.propagate = False
 
+# The NSP API expects advancedFilter as a JSON string inside the JSON body;
+# building it from a dict here avoids the hand-escaped literal and sends the
+# canonical compact form
+_ADVANCED_FILTER = json.dumps({
+    "includeRootCauseAndImpactDetails": True,
+    "includeAlarmDetailsOnChangeEvent": True
+}, separators=(',', ':'))
+
+# The fault-subscription request body is constant, so serialize it to bytes
+# once at import instead of rebuilding the dict and re-encoding it per call
+_FAULT_SUB_BODY = json.dumps({
+    "categories": [
+        {
+            "advancedFilter": _ADVANCED_FILTER,
+            "name": "NSP-FAULT"
+        }
+    ]
+}, separators=(',', ':')).encode('utf-8')
+
+
 class NSPSubscriptionManager:
     """Manages NSP notification subscriptions and Kafka integration."""
     
@@ -69,39 +111,72 @@ class NSPSubscriptionManager:
         self.config_file = config_file
         self.server = None
         self.token = None
+        self._token_expiry = 0.0
         self.subscriptions = []
+        self._config = None
+        self._config_mtime = -1.0
         
         # Load configuration
         self._load_config()
         
         # Suppress SSL warnings for self-signed certificates
         requests.packages.urllib3.disable_warnings()
+
+        # Shared pooled keep-alive session: token refreshes and
+        # subscription calls target the same server, so reusing the token
+        # manager's session saves a TLS handshake per operation
+        self._session = nsp_token_manager.get_session()
+        self._session.headers.update({'Content-Type': 'application/json'})
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[502, 503, 504])
+        ))
+
+    def close(self):
+        """Close the pooled HTTP session."""
+        self._session.close()
     
+    def _get_config(self) -> configparser.ConfigParser:
+        """Return the parsed config, re-reading the file only when it changed."""
+        mtime = os.stat(self.config_file).st_mtime
+        if self._config is None or mtime != self._config_mtime:
+            config = configparser.ConfigParser()
+            config.read(self.config_file)
+            self._config = config
+            self._config_mtime = mtime
+        return self._config
+
     def _load_config(self):
         """Load NSP configuration."""
         try:
-            config = configparser.ConfigParser()
-            config.read(self.config_file)
+            config = self._get_config()
             
             self.server = config.get('NSP', 'server')
             logger.info(f"Loaded NSP server configuration: {self.server}")
             
-        except (FileNotFoundError, configparser.Error) as e:
+        except (FileNotFoundError, configparser.Error, OSError) as e:
             logger.error(f"Failed to load configuration: {e}")
             raise ConfigError("Failed to load configuration.") from e
     
     def _get_valid_token(self) -> str:
         """Ensure we have a valid token and return it."""
+        # Warm cache: skip the token manager, its config re-read, and any
+        # HTTPS round trip while the instance's token is still live
+        if self.token and time.time() < self._token_expiry - 60:
+            return self.token
+
         try:
-            # Run token manager to ensure valid token
-            nsp_token_manager.main()
-            
-            # Read the updated token
-            config = configparser.ConfigParser()
-            config.read(self.config_file)
-            token = config.get('NSP', 'access_token')
-            
+            server, token, expiry = nsp_token_manager.get_valid_token_info()
+            if not token:
+                raise TokenError("No valid token obtained")
+
             self.token = token
+            self._token_expiry = expiry
+            # The session carries the bearer token for every call; it is
+            # rewritten only here, on rotation
+            self._session.headers['Authorization'] = f'Bearer {token}'
             logger.info("Successfully obtained valid NSP token")
             return token
             
@@ -115,34 +190,19 @@ class NSPSubscriptionManager:
     def create_fault_subscription(self, subscription_name: str = "nsp-fault-consumer") -> Dict:
         """Create a fault management subscription."""
         
-        token = self._get_valid_token()
+        self._get_valid_token()
         
         url = f"https://{self.server}/nbi-notification/api/v1/notifications/subscriptions"
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {token}'
-        }
-        
-        # Based on your Postman example - fault management subscription
-        subscription_data = {
-            "categories": [
-                {
-                    "advancedFilter": "{\"includeRootCauseAndImpactDetails\":true, \"includeAlarmDetailsOnChangeEvent\":true}",
-                    "name": "NSP-FAULT"
-                }
-            ]
-        }
-        
         try:
             logger.info(f"Creating fault management subscription: {subscription_name}")
             logger.info(f"Subscription URL: {url}")
             
-            response = requests.post(
+            # Based on your Postman example - fault management subscription;
+            # the prebuilt bytes go straight into the socket
+            response = self._session.post(
                 url,
-                headers=headers,
-                json=subscription_data,
-                verify=False,
+                data=_FAULT_SUB_BODY,
                 timeout=30
             )
             
@@ -164,26 +224,22 @@ class NSPSubscriptionManager:
     def list_subscriptions(self) -> List[Dict]:
         """List all existing subscriptions."""
         
-        token = self._get_valid_token()
+        self._get_valid_token()
         url = f"https://{self.server}/nbi-notification/api/v1/notifications/subscriptions"
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
         try:
             logger.info("Retrieving existing subscriptions...")
             
-            response = requests.get(
+            response = self._session.get(
                 url,
-                headers=headers,
-                verify=False,
                 timeout=30
             )
             
             response.raise_for_status()
-            response_data = response.json()
+            # Parse the raw bytes directly; for accounts with thousands of
+            # subscriptions this skips requests' charset detection and the
+            # slower stdlib decoder
+            response_data = _json_loads(response.content)
             
             # NSP API returns data wrapped in response object
             if 'response' in response_data and 'data' in response_data['response']:
@@ -211,21 +267,14 @@ class NSPSubscriptionManager:
     def get_subscription_details(self, subscription_id: str) -> Dict:
         """Get detailed information about a specific subscription."""
         
-        token = self._get_valid_token()
+        self._get_valid_token()
         url = f"https://{self.server}/nbi-notification/api/v1/notifications/subscriptions/{subscription_id}"
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
         try:
             logger.info(f"Getting details for subscription: {subscription_id}")
             
-            response = requests.get(
+            response = self._session.get(
                 url,
-                headers=headers,
-                verify=False,
                 timeout=30
             )
             
@@ -240,24 +289,56 @@ class NSPSubscriptionManager:
             logger.error(f"Failed to get subscription details: {e}")
             raise
     
+    def get_subscription_details_bulk(self, subscription_ids: List[str],
+                                      max_workers: int = 8) -> Dict[str, Dict]:
+        """Get details for several subscriptions concurrently.
+
+        The per-id GETs are independent, so they are issued from a thread
+        pool over the pooled session and the network round trips overlap
+        instead of adding up.
+
+        Args:
+            subscription_ids: Subscription ids to fetch
+            max_workers: Upper bound on concurrent requests
+
+        Returns:
+            Dict mapping subscription id to its details; ids whose fetch
+            failed are omitted
+        """
+        # One token fetch up front, shared by every task via the session
+        self._get_valid_token()
+        base_url = f"https://{self.server}/nbi-notification/api/v1/notifications/subscriptions"
+
+        def fetch(sub_id):
+            response = self._session.get(f"{base_url}/{sub_id}", timeout=30)
+            response.raise_for_status()
+            return response.json()
+
+        results = {}
+        workers = min(max_workers, len(subscription_ids)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, sub_id): sub_id for sub_id in subscription_ids}
+            for future in as_completed(futures):
+                sub_id = futures[future]
+                try:
+                    results[sub_id] = future.result()
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"Failed to get details for subscription {sub_id}: {e}")
+
+        logger.info(f"✅ Retrieved details for {len(results)}/{len(subscription_ids)} subscriptions")
+        return results
+
     def delete_subscription(self, subscription_id: str) -> bool:
         """Delete a subscription."""
         
-        token = self._get_valid_token()
+        self._get_valid_token()
         url = f"https://{self.server}/nbi-notification/api/v1/notifications/subscriptions/{subscription_id}"
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
         try:
             logger.info(f"Deleting subscription: {subscription_id}")
             
-            response = requests.delete(
+            response = self._session.delete(
                 url,
-                headers=headers,
-                verify=False,
                 timeout=30
             )
             
@@ -273,7 +354,7 @@ class NSPSubscriptionManager:
     def get_kafka_connection_info(self) -> Dict:
         """Get Kafka connection information from NSP."""
         
-        token = self._get_valid_token()
+        self._get_valid_token()
         
         # Try different potential endpoints for Kafka info
         potential_endpoints = [
@@ -282,74 +363,84 @@ class NSPSubscriptionManager:
             f"https://{self.server}/nbi-notification/api/v1/config/kafka"
         ]
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
-        for endpoint in potential_endpoints:
-            try:
-                logger.info(f"Trying Kafka info endpoint: {endpoint}")
-                
-                response = requests.get(
-                    endpoint,
-                    headers=headers,
-                    verify=False,
-                    timeout=30
-                )
-                
+        # The candidate endpoints are independent probes against the same
+        # host, so race them: worst case is one timeout instead of three
+        def probe(endpoint):
+            logger.info(f"Trying Kafka info endpoint: {endpoint}")
+            return self._session.get(endpoint, timeout=10)
+
+        # No context manager: its implicit shutdown(wait=True) would block
+        # the early return below until the slowest probe times out
+        executor = ThreadPoolExecutor(max_workers=len(potential_endpoints))
+        try:
+            futures = {executor.submit(probe, ep): ep for ep in potential_endpoints}
+            for future in as_completed(futures):
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    logger.debug(f"Endpoint {futures[future]} failed: {e}")
+                    continue
+
                 if response.status_code == 200:
                     kafka_info = response.json()
                     logger.info("✅ Successfully retrieved Kafka connection info")
                     return kafka_info
-                    
-            except requests.exceptions.RequestException as e:
-                logger.debug(f"Endpoint {endpoint} failed: {e}")
-                continue
-        
+        finally:
+            # Return immediately; the losing probes finish (or time out)
+            # on their worker threads in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
         logger.warning("Could not retrieve Kafka connection info from any endpoint")
         return {}
     
     def display_subscription_summary(self, subscriptions: List[Dict]):
         """Display a summary of subscriptions."""
         
-        print(f"\n📋 NSP SUBSCRIPTION SUMMARY")
-        print(f"{'='*60}")
-        print(f"Total Subscriptions: {len(subscriptions)}")
-        print(f"Server: {self.server}")
-        print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}")
+        # Accumulate lines and write once: per-line print calls dominate
+        # CLI wall-clock for accounts with many subscriptions
+        sep = '=' * 60
+        lines = [
+            "\n📋 NSP SUBSCRIPTION SUMMARY",
+            sep,
+            f"Total Subscriptions: {len(subscriptions)}",
+            f"Server: {self.server}",
+            f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            sep,
+        ]
+        append = lines.append
         
         for i, sub in enumerate(subscriptions, 1):
-            print(f"\n🔗 Subscription #{i}")
+            append(f"\n🔗 Subscription #{i}")
             
             # Handle NSP subscription data format
             if isinstance(sub, dict):
-                print(f"   ID: {sub.get('subscriptionId', sub.get('id', 'N/A'))}")
-                print(f"   Topic ID: {sub.get('topicId', 'N/A')}")
-                print(f"   Stage: {sub.get('stage', 'N/A')}")
-                print(f"   Created: {sub.get('timeOfSubscription', sub.get('creationTime', 'N/A'))}")
-                print(f"   Expires: {sub.get('expiresAt', 'N/A')}")
-                print(f"   Persisted: {sub.get('persisted', 'N/A')}")
+                append(f"   ID: {sub.get('subscriptionId', sub.get('id', 'N/A'))}")
+                append(f"   Topic ID: {sub.get('topicId', 'N/A')}")
+                append(f"   Stage: {sub.get('stage', 'N/A')}")
+                append(f"   Created: {sub.get('timeOfSubscription', sub.get('creationTime', 'N/A'))}")
+                append(f"   Expires: {sub.get('expiresAt', 'N/A')}")
+                append(f"   Persisted: {sub.get('persisted', 'N/A')}")
             else:
-                print(f"   Raw data: {sub}")
+                append(f"   Raw data: {sub}")
             
             # Display categories
             categories = sub.get('categories', [])
             if categories:
-                print(f"   Categories:")
+                append(f"   Categories:")
                 for cat in categories:
-                    print(f"     - {cat.get('name', 'N/A')}")
+                    append(f"     - {cat.get('name', 'N/A')}")
                     if 'advancedFilter' in cat:
-                        print(f"       Filter: {cat['advancedFilter']}")
+                        append(f"       Filter: {cat['advancedFilter']}")
             
             # Display any Kafka-related info
             if 'kafkaTopic' in sub:
-                print(f"   Kafka Topic: {sub['kafkaTopic']}")
+                append(f"   Kafka Topic: {sub['kafkaTopic']}")
             if 'kafkaInfo' in sub:
-                print(f"   Kafka Info: {sub['kafkaInfo']}")
+                append(f"   Kafka Info: {sub['kafkaInfo']}")
         
-        print(f"\n{'='*60}")
+        append(f"\n{sep}")
+        lines.append('')
+        sys.stdout.write('\n'.join(lines))
 
 def main():
     """Main function for subscription management."""
@@ -364,12 +455,14 @@ def main():
                        help='Create a new fault management subscription')
     parser.add_argument('--list', action='store_true',
                        help='List all existing subscriptions')
-    parser.add_argument('--details', type=str, metavar='SUBSCRIPTION_ID',
-                       help='Get details for a specific subscription')
+    parser.add_argument('--details', type=str, metavar='SUBSCRIPTION_ID[,ID...]',
+                       help='Get details for one or more subscriptions (comma-separated)')
     parser.add_argument('--delete', type=str, metavar='SUBSCRIPTION_ID',
                        help='Delete a specific subscription')
     parser.add_argument('--kafka-info', action='store_true',
                        help='Get Kafka connection information')
+    parser.add_argument('--json', action='store_true',
+                       help='Emit the subscription list as raw JSON (with --list)')
     
     args = parser.parse_args()
     
@@ -387,13 +480,22 @@ def main():
             print(json.dumps(subscription, indent=2))
         
         elif args.list:
-            print("📋 Listing all subscriptions...")
-            subscriptions = manager.list_subscriptions()
-            manager.display_subscription_summary(subscriptions)
+            if args.json:
+                subscriptions = manager.list_subscriptions()
+                sys.stdout.buffer.write(_json_dumps_bytes(subscriptions) + b'\n')
+            else:
+                print("📋 Listing all subscriptions...")
+                subscriptions = manager.list_subscriptions()
+                manager.display_subscription_summary(subscriptions)
         
         elif args.details:
-            print(f"🔍 Getting details for subscription: {args.details}")
-            details = manager.get_subscription_details(args.details)
+            sub_ids = [s for s in args.details.split(',') if s]
+            if len(sub_ids) == 1:
+                print(f"🔍 Getting details for subscription: {sub_ids[0]}")
+                details = manager.get_subscription_details(sub_ids[0])
+            else:
+                print(f"🔍 Getting details for {len(sub_ids)} subscriptions...")
+                details = manager.get_subscription_details_bulk(sub_ids)
             print("📄 Subscription Details:")
             print(json.dumps(details, indent=2))
         
@@ -420,14 +522,16 @@ def main():
             subscriptions = manager.list_subscriptions()
             manager.display_subscription_summary(subscriptions)
     
-        except (TokenError, ConfigError, RequestException) as e:
-            logger.error(f"Operation failed: {e}")
-            print(f"\n❌ Error: {e}")
-            exit(1)
-        except Exception as e:
-            logger.error(f"Unexpected error during operation: {e}")
-            print(f"\n❌ Unexpected Error: {e}")
-            exit(1)
+    except (TokenError, ConfigError, RequestException) as e:
+        logger.error(f"Operation failed: {e}")
+        print(f"\n❌ Error: {e}")
+        exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error during operation: {e}")
+        print(f"\n❌ Unexpected Error: {e}")
+        exit(1)
+    finally:
+        manager.close()
 
 if __name__ == "__main__":
     main()
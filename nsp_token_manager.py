@@ -21,17 +21,23 @@ Date: 2025-01-28
 """
 
 import os
+import tempfile
 import time
 import requests
 import configparser
 import logging
+import urllib3
 from datetime import datetime
-import pytz
 from nsp_exceptions import ConfigError, TokenError, NetworkError
 from nsp_config_loader import ConfigLoader
 
-# Melbourne timezone
-TZ = pytz.timezone('Australia/Melbourne')
+# The lab servers use self-signed certificates; silence the per-request
+# warning once here rather than in every entry point
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Melbourne timezone, resolved lazily in is_active_time() so importing the
+# module doesn't pay for loading tzdata
+_TZ = None
 
 # Active hours (5 AM to 10 PM)
 START_HOUR = 5
@@ -40,6 +46,17 @@ END_HOUR = 22
 # Network configuration
 REQUEST_TIMEOUT = 30  # seconds
 
+# Shared keep-alive session: the auth endpoint and any caller going through
+# get_session() reuse one pooled TLS connection instead of a handshake per
+# request (verification is off for the lab's self-signed certificates)
+_SESSION = requests.Session()
+_SESSION.verify = False
+
+
+def get_session():
+    """Return the process-wide pooled requests Session."""
+    return _SESSION
+
 # Configure module-specific logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -64,11 +81,19 @@ if not logger.handlers:
 
 def is_active_time():
     """Check if the current time is within the active window in Melbourne timezone."""
-    now_melbourne = datetime.now(TZ)
+    global _TZ
+    if _TZ is None:
+        from zoneinfo import ZoneInfo
+        _TZ = ZoneInfo('Australia/Melbourne')
+    now_melbourne = datetime.now(_TZ)
     return START_HOUR <= now_melbourne.hour < END_HOUR
 
 def get_token_from_config(config):
-    """Retrieve a token from the config if it exists and is not expired."""
+    """Retrieve the server and token from the config if not expired.
+
+    Returns (server, access_token, expiry_time) when a live token exists,
+    otherwise None.
+    """
     try:
         # Get token_expiry as string first to check if it's empty
         expiry_str = config.get('NSP', 'token_expiry', fallback='').strip()
@@ -77,13 +102,13 @@ def get_token_from_config(config):
             return None
             
         expiry_time = float(expiry_str)
-        access_token = config.get('NSP', 'access_token')
-        refresh_token = config.get('NSP', 'refresh_token')
 
         # Check if the token is expired (with a 60-second buffer)
         if time.time() < expiry_time - 60:
-            return access_token, refresh_token
-    except (configparser.NoOptionError, configparser.NoSectionError):
+            access_token = config.get('NSP', 'access_token')
+            server = os.environ.get('NSP_SERVER', config.get('NSP', 'server'))
+            return server, access_token, expiry_time
+    except (ValueError, configparser.NoOptionError, configparser.NoSectionError):
         # If keys don't exist, it's not an error, just no token.
         return None
     return None
@@ -92,17 +117,32 @@ def save_token_to_config(config, token_data):
     """Save the new token details back to the INI file."""
     expires_in = token_data.get('expires_in', 3600)
     expiry_time = time.time() + expires_in
-    
+
+    # If the server handed back the same access token, update the expiry
+    # in memory only and skip the disk write
+    token_unchanged = (
+        config.get('NSP', 'access_token', fallback=None) == token_data['access_token']
+    )
+
     config.set('NSP', 'access_token', token_data['access_token'])
     config.set('NSP', 'refresh_token', token_data['refresh_token'])
     config.set('NSP', 'token_expiry', str(expiry_time))
-    
+
+    if token_unchanged:
+        logger.debug("Access token unchanged; skipping config file write")
+        return
+
+    config_file = os.environ.get('NSP_CONFIG', 'nsp_config.ini')
     try:
-        config_file = os.environ.get('NSP_CONFIG', 'nsp_config.ini')
-        with open(config_file, 'w') as configfile:
+        # Write to a temp file in the same directory and rename over the
+        # original, so a crash mid-write can never leave a partial config
+        config_dir = os.path.dirname(os.path.abspath(config_file))
+        fd, tmp_path = tempfile.mkstemp(dir=config_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as configfile:
             config.write(configfile)
+        os.replace(tmp_path, config_file)
         logger.info(f"Successfully updated {config_file} with new token")
-    except IOError as e:
+    except (IOError, OSError) as e:
         logger.error(f"Could not write updated token to {config_file}: {e}")
 
 def validate_config(config):
@@ -126,11 +166,10 @@ def request_initial_token(server, user, password):
     url = f"https://{server}/rest-gateway/rest/api/v1/auth/token"
     payload = {"grant_type": "client_credentials"}
     try:
-        response = requests.post(
+        response = _SESSION.post(
             url,
             auth=(user, password),
             json=payload,
-            verify=False, # Necessary for private CAs
             timeout=REQUEST_TIMEOUT
         )
         response.raise_for_status()
@@ -157,7 +196,7 @@ def refresh_existing_token(server, refresh_token):
     url = f"https://{server}/rest-gateway/rest/api/v1/auth/token"
     payload = {"grant_type": "refresh_token", "refresh_token": refresh_token}
     try:
-        response = requests.post(url, json=payload, verify=False, timeout=REQUEST_TIMEOUT)
+        response = _SESSION.post(url, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         logger.info("Successfully refreshed token")
         return response.json()
@@ -176,23 +215,34 @@ def refresh_existing_token(server, refresh_token):
         logger.error(f"Token refresh failed: {e}")
         raise TokenError(f"Failed to refresh token: {e}") from e
 
-def get_valid_token():
-    """Get a valid token, only refreshing if necessary."""
+def get_valid_token_info():
+    """Get a valid token plus its expiry, only refreshing if necessary.
+
+    Returns (server, access_token, expiry_epoch); the expiry lets callers
+    cache the token themselves and skip this call entirely while it is
+    still live.
+    """
     try:
-        config_loader = ConfigLoader()
+        config_loader = ConfigLoader.get()
         config = config_loader.config
-        validate_config(config)
-        server, user, password = get_credentials(config)
-    except (FileNotFoundError, configparser.NoSectionError, configparser.NoOptionError, ValueError) as e:
+    except (FileNotFoundError, configparser.Error) as e:
         logger.error(f"Configuration error: {e}")
-        return None, None
+        return None, None, 0.0
 
-    # First, check if we have a valid token that's not expired
+    # Warm-cache fast path: neither full validation nor credential lookup
+    # is needed while the stored token is still live
     cached_token = get_token_from_config(config)
     if cached_token:
-        access_token, refresh_token = cached_token
+        server, access_token, expiry_time = cached_token
         logger.debug("Found valid non-expired token in config")
-        return server, access_token
+        return server, access_token, expiry_time
+
+    try:
+        validate_config(config)
+        server, user, password = get_credentials(config)
+    except (configparser.NoSectionError, configparser.NoOptionError, ValueError) as e:
+        logger.error(f"Configuration error: {e}")
+        return None, None, 0.0
     
     # Token is expired or doesn't exist, try to refresh first
     try:
@@ -204,7 +254,8 @@ def get_valid_token():
                 token_data = refresh_existing_token(server, existing_refresh)
                 if token_data and 'access_token' in token_data:
                     save_token_to_config(config, token_data)
-                    return server, token_data['access_token']
+                    expiry_time = time.time() + token_data.get('expires_in', 3600)
+                    return server, token_data['access_token'], expiry_time
             except TokenError as e:
                 # If it's a network error, re-raise it
                 if "Cannot reach NSP server" in str(e) or "Timeout connecting" in str(e):
@@ -222,7 +273,8 @@ def get_valid_token():
         token_data = request_initial_token(server, user, password)
         if token_data and 'access_token' in token_data:
             save_token_to_config(config, token_data)
-            return server, token_data['access_token']
+            expiry_time = time.time() + token_data.get('expires_in', 3600)
+            return server, token_data['access_token'], expiry_time
     except TokenError:
         # Re-raise token errors with clear messaging
         raise
@@ -230,6 +282,11 @@ def get_valid_token():
     logger.error("Failed to obtain any valid token")
     raise TokenError("Failed to obtain any valid token")
 
+def get_valid_token():
+    """Get a valid token, only refreshing if necessary."""
+    server, access_token, _ = get_valid_token_info()
+    return server, access_token
+
 def main():
     """Main script logic - for backwards compatibility."""
     if not is_active_time():
@@ -243,7 +300,5 @@ def main():
         print("# Failed to obtain a valid token.")
 
 if __name__ == "__main__":
-    # Suppress InsecureRequestWarning from requests library
-    requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
     main()
 
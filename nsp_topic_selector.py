@@ -11,118 +11,297 @@ Date: 2025-01-29
 """
 
 from typing import List, Dict, Set, Optional, Tuple
+from collections import OrderedDict
+import re
 import sys
+import threading
+
+# Categorization rules in precedence order. Each topic used to be scanned by
+# up to ten separate any(kw in topic ...) generator passes; compiling every
+# keyword into one alternation lets a single regex scan report all hits, and
+# the per-keyword priority reproduces the old if/elif ordering exactly
+# (smallest priority wins).
+_KEYWORD_RULES = (
+    (0, 'Alarms & Fault Management', ('alarm', 'fault', 'health', '-fm', 'notification')),
+    (3, 'OAM & Operations', ('test_', 'telemetry', 'pm_results')),
+    (4, 'Real-time Analytics & KPI', ('rt-', 'realtime', 'kpi', 'rta.', 'anomal', 'stats')),
+    (5, 'Network Elements & Devices', ('ne-', 'device', 'equipment', 'netconf', 'neat')),
+    (6, 'Service Operations & IBSF', ('svc', 'service', 'async_', 'ibsf', 'som-')),
+    (7, 'Intent & Configuration Mgmt', ('intent', 'config', 'deploy', 'icm')),
+    (8, 'Performance & Monitoring', ('pm-enum', 'performance', 'monitoring', 'collection')),
+    (9, 'Security & Access Control', ('security', 'whitelist', 'access', 'auth', 'token')),
+    (10, 'Workflow & Automation', ('wfm', 'workflow', 'schedule', 'lsom', 'automation')),
+    (11, 'Events & Sessions', ('event', 'session')),
+    (11, 'Other Topics', ('user_messages',)),
+    (12, 'System & Internal', ('internal', 'system', 'altiplano', 'mdt-', 'mdc_', 'nsp_internal')),
+)
+
+# Prefix rules stay as cheap startswith checks; their priorities slot them
+# between the alarm keywords and everything else, as in the old ladder
+_PREFIX_RULES = (
+    (1, 'NSP Database & Storage', ('nsp-db-',)),
+    (2, 'NSP Sync & Data Upload', ('nsp-sync-', 'nsp-upload-')),
+    (3, 'OAM & Operations', ('oam.',)),
+)
+
+_KEYWORD_MAP = {kw: (prio, cat)
+                for prio, cat, kws in _KEYWORD_RULES
+                for kw in kws}
+# Only the priority-0 alarm keywords can outrank a prefix rule, so topics
+# that matched a prefix get this much smaller scan instead of the full one
+_ALARM_RE = re.compile('|'.join(re.escape(kw) for kw in _KEYWORD_RULES[0][2]))
+
+# Wrapped in a lookahead so overlapping hits (e.g. 'som-' inside 'lsom-')
+# are all reported; alternatives are tried in precedence order per position
+_KEYWORD_RE = re.compile('(?=(' + '|'.join(re.escape(kw)
+                                           for _, _, kws in _KEYWORD_RULES
+                                           for kw in kws) + '))')
+
+# Display order for the category menu (Events & Sessions historically came
+# last because it was appended by the old second-pass fixup)
+# Sentinel values a selection menu may return alongside real topic names
+_SPECIAL_MARKERS = frozenset({'__back__', '__select_all__', '__deselect_all__'})
+
+# Static menu text, built once instead of per redraw
+_MENU_RULE = '=' * 50
+_MENU_OPTIONS_HEADER = '\n🎯 Selection Options:'
+
+_CATEGORY_ORDER = (
+    'Alarms & Fault Management',
+    'NSP Database & Storage',
+    'NSP Sync & Data Upload',
+    'OAM & Operations',
+    'Real-time Analytics & KPI',
+    'Network Elements & Devices',
+    'Service Operations & IBSF',
+    'Intent & Configuration Mgmt',
+    'Performance & Monitoring',
+    'Security & Access Control',
+    'Workflow & Automation',
+    'System & Internal',
+    'Other Topics',
+    'Events & Sessions',
+)
+
+
+# Categorization results memoized by topic tuple: a consumer that
+# reconnects after a Kafka rebalance rebuilds its selector with the same
+# inventory, so the whole pass can be skipped. Small LRU, lock-guarded
+# since the consumer polls from a background thread.
+_CATEGORIZE_CACHE: 'OrderedDict[Tuple[str, ...], Tuple[Dict, Dict]]' = OrderedDict()
+_CATEGORIZE_CACHE_MAX = 8
+_CATEGORIZE_LOCK = threading.Lock()
 
 
 class TopicSelector:
     """Handles topic categorization and interactive selection."""
-    
+
+    # Instances are long-lived in the consumer; slots drop the per-instance
+    # __dict__ and keep attribute access on the fast path
+    __slots__ = (
+        'all_available_topics',
+        '_all_topics_set',
+        'default_topics',
+        '_valid_defaults',
+        'selected_topics',
+        '_topic_lower',
+        '_topic_to_category',
+        'topic_categories',
+        '_category_topic_sets',
+        '_category_selected_counts',
+        '_menu_cache',
+        '_category_lines',
+        '_cat_line_idle',
+        '_cat_line_selected_fmt',
+        '_dirty_categories',
+    )
+
     def __init__(self, all_available_topics: List[str], default_topics: Optional[List[str]] = None):
         self.all_available_topics = sorted(all_available_topics)
         self.default_topics = default_topics or ['oam.events', 'health-alarms', 'nsp-db-fm']
         self.selected_topics: Set[str] = set()
-        self.topic_categories = self._categorize_topics(all_available_topics)
+        # Lowercase each topic once up front; categorization and any
+        # interactive filtering would otherwise re-lower the whole list
+        # on every pass
+        self._topic_lower: Dict[str, str] = {t: t.lower() for t in self.all_available_topics}
+        # Hashed membership for existence checks; the sorted list stays for
+        # ordered display
+        self._all_topics_set: frozenset = frozenset(self.all_available_topics)
+        # Defaults are validated against the inventory once, so the default
+        # action never rechecks or miscounts topics that don't exist here
+        self._valid_defaults: Tuple[str, ...] = tuple(
+            t for t in self.default_topics if t in self._all_topics_set
+        )
+        # _categorize_topics also fills the reverse topic->category index;
+        # feeding it the globally sorted list keeps every bucket sorted for
+        # free, so no per-category sort is needed
+        cache_key = tuple(self.all_available_topics)
+        with _CATEGORIZE_LOCK:
+            cached = _CATEGORIZE_CACHE.get(cache_key)
+            if cached is not None:
+                _CATEGORIZE_CACHE.move_to_end(cache_key)
+        if cached is not None:
+            # Shallow copies are safe: bucket values are immutable tuples
+            self.topic_categories = dict(cached[0])
+            self._topic_to_category = dict(cached[1])
+        else:
+            self._topic_to_category = {}
+            self.topic_categories = self._categorize_topics(self.all_available_topics)
+            with _CATEGORIZE_LOCK:
+                _CATEGORIZE_CACHE[cache_key] = (self.topic_categories,
+                                                self._topic_to_category)
+                while len(_CATEGORIZE_CACHE) > _CATEGORIZE_CACHE_MAX:
+                    _CATEGORIZE_CACHE.popitem(last=False)
+        # Frozen per-category sets for the set-arithmetic selection paths;
+        # built once here instead of set(topics) per menu visit
+        self._category_topic_sets: Dict[str, frozenset] = {
+            c: frozenset(ts) for c, ts in self.topic_categories.items()
+        }
+        # Per-category selection counters, kept current by _select_topic/
+        # _deselect_topic so a menu redraw costs O(categories) instead of
+        # recounting every topic
+        self._category_selected_counts: Dict[str, int] = {c: 0 for c in self.topic_categories}
+        # Rendered-menu cache: the full menu text is rebuilt only after a
+        # selection change, and then only the lines of touched categories
+        self._menu_cache: Optional[str] = None
+        self._category_lines: Dict[str, str] = {}
+        # Topic counts never change after categorization, so the idle line
+        # and the selected-line template are frozen per category; a redraw
+        # only fills in the selected count
+        self._cat_line_idle: Dict[str, str] = {
+            c: f"{c} ({len(ts)} topics)" for c, ts in self.topic_categories.items()
+        }
+        self._cat_line_selected_fmt: Dict[str, str] = {
+            c: f"{c} ({len(ts)} topics, {{n}} selected)"
+            for c, ts in self.topic_categories.items()
+        }
+        self._dirty_categories: Set[str] = set(self.topic_categories)
 
-    def _categorize_topics(self, topics: List[str]) -> Dict[str, List[str]]:
+    def _categorize_topics(self, topics: List[str]) -> Dict[str, Tuple[str, ...]]:
         """Categorize topics into logical groups for hierarchical navigation."""
-        categories = {
-            'Alarms & Fault Management': [],
-            'NSP Database & Storage': [],
-            'NSP Sync & Data Upload': [],
-            'OAM & Operations': [],
-            'Real-time Analytics & KPI': [],
-            'Network Elements & Devices': [],
-            'Service Operations & IBSF': [],
-            'Intent & Configuration Mgmt': [],
-            'Performance & Monitoring': [],
-            'Security & Access Control': [],
-            'Workflow & Automation': [],
-            'System & Internal': [],
-            'Other Topics': []
-        }
-        
+        keyword_map = _KEYWORD_MAP
+        lower_map = self._topic_lower
+        topic_to_category = self._topic_to_category
+        buckets: Dict[str, List[str]] = {}
+
         for topic in topics:
-            topic_lower = topic.lower()
-            
-            # Alarms & Fault Management - most critical category
-            if any(kw in topic_lower for kw in ['alarm', 'fault', 'health', '-fm', 'notification']):
-                categories['Alarms & Fault Management'].append(topic)
-            
-            # NSP Database & Storage topics
-            elif topic.startswith('nsp-db-'):
-                categories['NSP Database & Storage'].append(topic)
-            
-            # NSP Sync & Data Upload operations
-            elif topic.startswith('nsp-sync-') or topic.startswith('nsp-upload-'):
-                categories['NSP Sync & Data Upload'].append(topic)
-            
-            # OAM (Operations, Administration, Maintenance)
-            elif topic.startswith('oam.') or any(kw in topic_lower for kw in ['test_', 'telemetry', 'pm_results']):
-                categories['OAM & Operations'].append(topic)
-            
-            # Real-time Analytics & KPI
-            elif any(kw in topic_lower for kw in ['rt-', 'realtime', 'kpi', 'rta.', 'anomal', 'stats']):
-                categories['Real-time Analytics & KPI'].append(topic)
-            
-            # Network Elements & Devices
-            elif any(kw in topic_lower for kw in ['ne-', 'device', 'equipment', 'netconf', 'neat']):
-                categories['Network Elements & Devices'].append(topic)
-            
-            # Service Operations & IBSF (Intent-Based Service Function)
-            elif any(kw in topic_lower for kw in ['svc', 'service', 'async_', 'ibsf', 'som-']):
-                categories['Service Operations & IBSF'].append(topic)
-            
-            # Intent & Configuration Management
-            elif any(kw in topic_lower for kw in ['intent', 'config', 'deploy', 'icm']):
-                categories['Intent & Configuration Mgmt'].append(topic)
-            
-            # Performance & Monitoring
-            elif any(kw in topic_lower for kw in ['pm-enum', 'performance', 'monitoring', 'collection']):
-                categories['Performance & Monitoring'].append(topic)
-            
-            # Security & Access Control
-            elif any(kw in topic_lower for kw in ['security', 'whitelist', 'access', 'auth', 'token']):
-                categories['Security & Access Control'].append(topic)
-            
-            # Workflow & Automation
-            elif any(kw in topic_lower for kw in ['wfm', 'workflow', 'schedule', 'lsom', 'automation']):
-                categories['Workflow & Automation'].append(topic)
-            
-            # Events & Sessions
-            elif any(kw in topic_lower for kw in ['event', 'session', 'user_messages']):
-                # Check if it's not already caught by alarms (since 'event' is in both)
-                if not any(kw in topic_lower for kw in ['alarm', 'fault', 'health', '-fm']):
-                    categories['Other Topics'].append(topic)  # Will be handled by event logic below
-                else:
-                    categories['Alarms & Fault Management'].append(topic)
-            
-            # System & Internal operations
-            elif any(kw in topic_lower for kw in ['internal', 'system', 'altiplano', 'mdt-', 'mdc_', 'nsp_internal']):
-                categories['System & Internal'].append(topic)
-            
+            topic_lower = lower_map[topic]
+            best = None
+
+            # Prefix rules first: they are single startswith checks
+            for priority, category, prefixes in _PREFIX_RULES:
+                if topic.startswith(prefixes):
+                    best = (priority, category)
+                    break
+
+            if best is not None:
+                # A prefix won; only an alarm keyword can still outrank it
+                if _ALARM_RE.search(topic_lower):
+                    best = (0, 'Alarms & Fault Management')
             else:
-                categories['Other Topics'].append(topic)
-        
-        # Second pass: handle event topics that aren't alarms
-        event_topics_to_move = []
-        for topic in categories['Other Topics']:
-            topic_lower = topic.lower()
-            if any(kw in topic_lower for kw in ['event', 'session']) and not any(kw in topic_lower for kw in ['alarm', 'fault']):
-                event_topics_to_move.append(topic)
-        
-        # Add new category for events if we have any
-        if event_topics_to_move:
-            categories['Events & Sessions'] = event_topics_to_move
-            for topic in event_topics_to_move:
-                categories['Other Topics'].remove(topic)
-        
-        # Remove empty categories and sort topics within each category
-        filtered_categories = {}
-        for k, v in categories.items():
-            if v:
-                filtered_categories[k] = sorted(v)
-        
-        return filtered_categories
+                # One linear scan reports every keyword hit; keep the
+                # highest-precedence one
+                for match in _KEYWORD_RE.finditer(topic_lower):
+                    hit = keyword_map[match.group(1)]
+                    if best is None or hit[0] < best[0]:
+                        best = hit
+                        if hit[0] == 0:
+                            break
+
+            category = best[1] if best is not None else 'Other Topics'
+            topic_to_category[topic] = category
+            buckets.setdefault(category, []).append(topic)
+
+        # Emit non-empty categories in display order; buckets were filled
+        # from the sorted topic list, so they are already sorted. Tuples
+        # keep the buckets immutable for downstream consumers.
+        categorized = {}
+        for category in _CATEGORY_ORDER:
+            bucket = buckets.get(category)
+            if bucket:
+                categorized[category] = tuple(bucket)
+        return categorized
+
+    def _select_topic(self, topic: str):
+        """Add a topic to the selection, updating the category counter."""
+        if topic not in self.selected_topics:
+            self.selected_topics.add(topic)
+            category = self._topic_to_category.get(topic)
+            if category:
+                self._category_selected_counts[category] += 1
+                self._dirty_categories.add(category)
+                self._menu_cache = None
+
+    def _deselect_topic(self, topic: str):
+        """Remove a topic from the selection, updating the category counter."""
+        if topic in self.selected_topics:
+            self.selected_topics.remove(topic)
+            category = self._topic_to_category.get(topic)
+            if category:
+                self._category_selected_counts[category] -= 1
+                self._dirty_categories.add(category)
+                self._menu_cache = None
+
+    def _select_category(self, category: str):
+        """Select every topic in a category with one batch counter update."""
+        topics = self.topic_categories.get(category)
+        if not topics:
+            return
+        before = len(self.selected_topics)
+        self.selected_topics.update(topics)
+        added = len(self.selected_topics) - before
+        if added:
+            self._category_selected_counts[category] += added
+            self._dirty_categories.add(category)
+            self._menu_cache = None
+
+    def _deselect_category(self, category: str):
+        """Deselect every topic in a category with one batch counter update."""
+        topics = self._category_topic_sets.get(category)
+        if not topics:
+            return
+        before = len(self.selected_topics)
+        self.selected_topics.difference_update(topics)
+        removed = before - len(self.selected_topics)
+        if removed:
+            self._category_selected_counts[category] -= removed
+            self._dirty_categories.add(category)
+            self._menu_cache = None
+
+    def _apply_category_selection(self, category: str, selected: List[str]):
+        """Replace a category's selection with the picks from one menu visit.
+
+        ``selected`` is the raw multi-select result and may contain special
+        markers; those are stripped with one set subtraction rather than a
+        per-item startswith filter.
+        """
+        category_set = self._category_topic_sets.get(category)
+        if category_set is None:
+            return
+        picks = (set(selected) - _SPECIAL_MARKERS) & category_set
+        self.selected_topics.difference_update(category_set)
+        self.selected_topics |= picks
+        self._category_selected_counts[category] = len(picks)
+        self._dirty_categories.add(category)
+        self._menu_cache = None
+
+    def _clear_selection(self):
+        """Deselect everything without walking topics per category."""
+        if not self.selected_topics:
+            return
+        self.selected_topics.clear()
+        counts = self._category_selected_counts
+        for category, count in counts.items():
+            if count:
+                counts[category] = 0
+                self._dirty_categories.add(category)
+        self._menu_cache = None
+
+    def _select_defaults(self):
+        """Reset the selection to the configured default topics."""
+        self._clear_selection()
+        for topic in self._valid_defaults:
+            self._select_topic(topic)
 
     def show_category_menu(self) -> List[str]:
         """Show hierarchical category menu for topic selection with multi-selection support."""
@@ -142,11 +321,27 @@ class TopicSelector:
 
     def _display_categories(self):
         """Display the category menu with selection status."""
-        print(f"\n📁 Topic Categories ({len(self.topic_categories)} categories):")
-        print("=" * 50)
-        for i, category in enumerate(self.topic_categories, 1):
-            print(f"{i}. {category} ({len(self.topic_categories[category])} topics)")
-        print("\n🎯 Selection Options:")
+        if self._menu_cache is None:
+            counts = self._category_selected_counts
+            # Re-render only the category lines whose selection changed,
+            # from the precomputed templates
+            for category in self._dirty_categories:
+                selected = counts[category]
+                if selected:
+                    self._category_lines[category] = (
+                        self._cat_line_selected_fmt[category].format(n=selected)
+                    )
+                else:
+                    self._category_lines[category] = self._cat_line_idle[category]
+            self._dirty_categories.clear()
+
+            lines = [f"\n📁 Topic Categories ({len(self.topic_categories)} categories):",
+                     _MENU_RULE]
+            lines.extend(f"{i}. {self._category_lines[category]}"
+                         for i, category in enumerate(self.topic_categories, 1))
+            lines.append(_MENU_OPTIONS_HEADER)
+            self._menu_cache = '\n'.join(lines)
+        print(self._menu_cache)
 
     def _show_topic_selection(self, topics: List[str], category_name: str):
         """Show topic selection within a category."""
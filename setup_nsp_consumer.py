@@ -26,6 +26,7 @@ import yaml
 import requests
 import configparser
 import subprocess
+import tempfile
 import time
 import getpass
 import base64
@@ -41,6 +42,22 @@ DEBUG = False  # Set to True for detailed output like listing secrets
 SETUP_CACHE_FILE = '.nsp_setup_cache.json'
 CONFIG_FILE = 'nsp_config.ini'
 
+# OpenSSH connection multiplexing: the first ssh call to a host becomes a
+# master that stays alive for ControlPersist seconds, and every later
+# ssh/scp to the same host rides that established connection instead of
+# redoing the TCP + key-exchange + auth handshake. Setup issues dozens of
+# commands against the deployer, so this collapses N handshakes into one.
+_SSH_CONTROL_DIR = os.path.join(tempfile.gettempdir(), f'nsp-setup-ssh-{os.getuid()}')
+
+def ssh_mux_opts():
+    """Return multiplexing options for ssh/scp, or '' if unavailable"""
+    try:
+        os.makedirs(_SSH_CONTROL_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return ''
+    return (f'-o ControlMaster=auto -o ControlPath={_SSH_CONTROL_DIR}/%r@%h-%p '
+            f'-o ControlPersist=300')
+
 def log(message):
     """Enhanced logging with timestamps"""
     if VERBOSE:
@@ -50,12 +67,13 @@ def log(message):
 def test_ssh_connection(host, username, password=None):
     """Test SSH connection with key or password"""
     try:
+        mux = ssh_mux_opts()
         if password:
             # Test with password using sshpass
-            test_cmd = f'sshpass -p "{password}" ssh -o ConnectTimeout=10 -o StrictHostKeyChecking=no {username}@{host} "echo SSH_OK"'
+            test_cmd = f'sshpass -p "{password}" ssh {mux} -o ConnectTimeout=10 -o StrictHostKeyChecking=no {username}@{host} "echo SSH_OK"'
         else:
             # Test with SSH key
-            test_cmd = f'ssh -o ConnectTimeout=10 -o BatchMode=yes -o StrictHostKeyChecking=no {username}@{host} "echo SSH_OK"'
+            test_cmd = f'ssh {mux} -o ConnectTimeout=10 -o BatchMode=yes -o StrictHostKeyChecking=no {username}@{host} "echo SSH_OK"'
         
         result = subprocess.getoutput(test_cmd)
         return "SSH_OK" in result
@@ -66,10 +84,11 @@ def test_ssh_connection(host, username, password=None):
 def execute_ssh_command(host, username, command, password=None):
     """Execute command on remote host via SSH"""
     try:
+        mux = ssh_mux_opts()
         if password:
-            cmd = f'sshpass -p "{password}" ssh -o StrictHostKeyChecking=no {username}@{host} "{command}"'
+            cmd = f'sshpass -p "{password}" ssh {mux} -o StrictHostKeyChecking=no {username}@{host} "{command}"'
         else:
-            cmd = f'ssh -o BatchMode=yes -o StrictHostKeyChecking=no {username}@{host} "{command}"'
+            cmd = f'ssh {mux} -o BatchMode=yes -o StrictHostKeyChecking=no {username}@{host} "{command}"'
         
         log(f"💻 Executing on {host}: {command}")
         result = subprocess.getoutput(cmd)
@@ -604,7 +623,7 @@ def handle_ssl_certificates(cluster_host, deployer_host, username, password, kaf
             
             if result is None or "error" not in result.lower():
                 # Copy from deployer to local
-                scp_cmd = f"scp -o StrictHostKeyChecking=no {username}@{deployer_host}:{remote_tmp} {local_cert_path}"
+                scp_cmd = f"scp {ssh_mux_opts()} -o StrictHostKeyChecking=no {username}@{deployer_host}:{remote_tmp} {local_cert_path}"
                 if password:
                     scp_cmd = f"sshpass -p '{password}' {scp_cmd}"
                 
@@ -625,7 +644,7 @@ def handle_ssl_certificates(cluster_host, deployer_host, username, password, kaf
                 execute_ssh_command(deployer_host, username, scp_cluster_to_deployer, password)
                 
                 # Step 3: Copy from deployer host to local
-                scp_cmd = f"scp -o StrictHostKeyChecking=no {username}@{deployer_host}:{remote_tmp} {local_cert_path}"
+                scp_cmd = f"scp {ssh_mux_opts()} -o StrictHostKeyChecking=no {username}@{deployer_host}:{remote_tmp} {local_cert_path}"
                 if password:
                     scp_cmd = f"sshpass -p '{password}' {scp_cmd}"
                 